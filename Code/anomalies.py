@@ -0,0 +1,234 @@
+import re
+import time
+from collections import deque, namedtuple
+
+
+# A single alert rule. `metric` is "cpu" (percent of one core, as top reports
+# it), "rss" (smoothed RSS in MB) or "rss_slope" (RSS growth in MB per minute);
+# the condition must hold continuously for `duration` seconds before the rule
+# fires.
+Rule = namedtuple("Rule", ["name", "metric", "threshold", "duration"])
+
+# A fired alert, as shown in the notification log.
+Alert = namedtuple("Alert", ["timestamp", "rule", "pid", "name", "value"])
+
+DEFAULT_RULES = "rss_slope > 10 for 10m; cpu > 90 for 60s"
+
+METRICS = ("cpu", "rss", "rss_slope")
+
+_RULE_PATTERN = re.compile(
+    r"^\s*(?P<metric>\w+)\s*>\s*(?P<threshold>[\d.]+)\s*"
+    r"for\s*(?P<amount>[\d.]+)\s*(?P<unit>[smh]?)\s*$")
+_UNIT_SECONDS = {"": 1, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_rules(text):
+    """
+    Parses rules such as "rss_slope > 10 for 10m; cpu > 90 for 60s".
+    Rules are separated by ';' and durations accept s/m/h suffixes.
+    Raises ValueError on malformed input.
+    """
+    rules = []
+    for chunk in text.split(";"):
+        if not chunk.strip():
+            continue
+        match = _RULE_PATTERN.match(chunk)
+        if not match or match.group("metric") not in METRICS:
+            raise ValueError(f"Invalid alert rule: '{chunk.strip()}'")
+        duration = float(match.group("amount")) * \
+            _UNIT_SECONDS[match.group("unit")]
+        rules.append(Rule(chunk.strip(), match.group("metric"),
+                          float(match.group("threshold")), duration))
+    return rules
+
+
+class Ewma:
+    """Exponentially weighted moving average."""
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.value = None
+
+    def update(self, sample):
+        if self.value is None:
+            self.value = sample
+        else:
+            self.value += self.alpha * (sample - self.value)
+        return self.value
+
+
+class RollingSlope:
+    """
+    Least-squares slope over a sliding time window. Samples are folded into
+    fixed-width time buckets that keep running sums, so memory per series is
+    bounded by the bucket count, not the window length, and each update is
+    O(1). The oldest bucket may be partial, so one extra bucket is kept.
+    """
+
+    def __init__(self, window, buckets=10):
+        self.window = window
+        self.width = window / buckets
+        self.max_buckets = buckets + 1
+        # Each bucket is [index, first_t, n, sum_t, sum_y, sum_tt, sum_ty]
+        self.buckets = deque()
+        self.totals = [0, 0.0, 0.0, 0.0, 0.0]
+        self.origin = None
+        self.last_t = 0.0
+
+    def update(self, timestamp, value):
+        # Times are kept relative to the first sample to limit float error
+        if self.origin is None:
+            self.origin = timestamp
+        t = timestamp - self.origin
+        self.last_t = t
+
+        index = int(t // self.width)
+        if not self.buckets or self.buckets[-1][0] != index:
+            self.buckets.append([index, t, 0, 0.0, 0.0, 0.0, 0.0])
+        bucket = self.buckets[-1]
+        for i, amount in enumerate((1, t, value, t * t, t * value)):
+            bucket[2 + i] += amount
+            self.totals[i] += amount
+
+        while self.buckets[0][0] <= index - self.max_buckets:
+            old = self.buckets.popleft()
+            for i in range(5):
+                self.totals[i] -= old[2 + i]
+
+    def span(self):
+        """Seconds covered by the samples currently in the window."""
+        if not self.buckets:
+            return 0.0
+        return self.last_t - self.buckets[0][1]
+
+    def slope(self):
+        """Slope in value units per second, or None with too few samples."""
+        n, sum_t, sum_y, sum_tt, sum_ty = self.totals
+        denominator = n * sum_tt - sum_t * sum_t
+        if n < 2 or denominator <= 0:
+            return None
+        return (n * sum_ty - sum_t * sum_y) / denominator
+
+    def rising(self):
+        """True if every bucket's mean is above the previous bucket's."""
+        means = [bucket[4] / bucket[2] for bucket in self.buckets]
+        return len(means) > 1 and all(
+            later > earlier for earlier, later in zip(means, means[1:]))
+
+
+class ProcessTracker:
+    """Rolling statistics and rule state for one (pid, create_time)."""
+
+    def __init__(self, rules, name):
+        self.name = name
+        self.cpu = Ewma()
+        self.rss = Ewma()
+        # One regression per distinct rss_slope window
+        self.slopes = {rule.duration: RollingSlope(rule.duration)
+                       for rule in rules if rule.metric == "rss_slope"}
+        # Start time of the current run where each rule's condition held
+        self.since = {}
+        self.firing = set()
+
+    def update(self, rules, timestamp, cpu_percent, rss_bytes):
+        """Feeds one sample and returns the list of (rule, value) that just fired."""
+        cpu = self.cpu.update(cpu_percent)
+        rss_mb = rss_bytes / 1024 / 1024
+        rss = self.rss.update(rss_mb)
+        for slope in self.slopes.values():
+            slope.update(timestamp, rss_mb)
+
+        fired = []
+        for rule in rules:
+            if rule.metric == "cpu":
+                value = cpu
+                holds = cpu > rule.threshold
+            elif rule.metric == "rss":
+                value = rss
+                holds = rss > rule.threshold
+            else:
+                slope = self.slopes[rule.duration]
+                per_second = slope.slope()
+                value = per_second * 60 if per_second is not None else 0.0
+                # The window itself provides the duration for slope rules;
+                # growth must show in every bucket, not in one jump
+                holds = (value > rule.threshold and
+                         slope.span() >= rule.duration and slope.rising())
+
+            if not holds:
+                self.since.pop(rule, None)
+                self.firing.discard(rule)
+                continue
+
+            started = self.since.setdefault(rule, timestamp)
+            if rule.metric == "rss_slope" or timestamp - started >= rule.duration:
+                if rule not in self.firing:
+                    self.firing.add(rule)
+                    fired.append((rule, value))
+        return fired
+
+
+class AnomalyDetector:
+    """
+    Evaluates alert rules against the per-process sample stream. State is
+    kept per (pid, create_time) so PID reuse never mixes two processes, and
+    each tick costs O(1) per sample regardless of history length. If ticks
+    stop for longer than `max_gap` seconds, all state is reset rather than
+    stretched across the unobserved gap.
+    """
+
+    def __init__(self, rules=None, max_log=200, max_gap=10.0):
+        self.rules = parse_rules(DEFAULT_RULES) if rules is None else rules
+        self.max_gap = max_gap
+        self.trackers = {}
+        self.log = deque(maxlen=max_log)
+        self.last_update = None
+
+    def update(self, samples, timestamp=None):
+        """
+        Feeds one tick of ProcessSample records and returns the new alerts.
+        Processes missing from the tick are forgotten.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        if self.last_update is not None and timestamp - self.last_update > self.max_gap:
+            self.trackers.clear()
+        self.last_update = timestamp
+
+        alerts = []
+        seen = set()
+        for sample in samples:
+            key = (sample.pid, sample.create_time)
+            seen.add(key)
+            tracker = self.trackers.get(key)
+            if tracker is None:
+                tracker = self.trackers[key] = ProcessTracker(
+                    self.rules, sample.name)
+            for rule, value in tracker.update(self.rules, timestamp,
+                                              sample.cpu_percent, sample.rss):
+                alerts.append(
+                    Alert(timestamp, rule, sample.pid, sample.name, value))
+
+        for key in self.trackers.keys() - seen:
+            del self.trackers[key]
+
+        self.log.extend(alerts)
+        return alerts
+
+    def active_pids(self):
+        """PIDs with at least one rule currently firing."""
+        return {pid for (pid, _), tracker in self.trackers.items()
+                if tracker.firing}
+
+    def active_names(self):
+        """Process names with at least one rule currently firing."""
+        return {tracker.name for tracker in self.trackers.values()
+                if tracker.firing}
+
+
+def format_alert(alert):
+    """Formats an alert for the notification log."""
+    stamp = time.strftime("%H:%M:%S", time.localtime(alert.timestamp))
+    unit = {"cpu": "%", "rss": "MB", "rss_slope": "MB/min"}[alert.rule.metric]
+    return (f"[{stamp}] {alert.name} (PID {alert.pid}): "
+            f"{alert.rule.name} (now {alert.value:.1f} {unit})")
@@ -0,0 +1,207 @@
+import os
+import time
+import psutil
+
+
+DEFAULT_CGROUP_ROOT = "/sys/fs/cgroup"
+DEFAULT_PROC_ROOT = "/proc"
+
+# Process states from /proc/[pid]/stat, named as psutil names them
+_PROC_STATES = {
+    "R": "running",
+    "S": "sleeping",
+    "D": "disk-sleep",
+    "Z": "zombie",
+    "T": "stopped",
+    "t": "tracing-stop",
+    "X": "dead",
+    "I": "idle"
+}
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def _read_file(path):
+    try:
+        with open(path, "r") as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+def _read_int(path):
+    text = _read_file(path)
+    try:
+        return int(text.strip()) if text is not None else None
+    except ValueError:
+        return None
+
+
+def getPidCgroup(pid, proc_root=DEFAULT_PROC_ROOT):
+    """
+    Returns the cgroup v2 path of a process (e.g. "/system.slice/ssh.service")
+    from /proc/[pid]/cgroup, or None if it cannot be read.
+    """
+    text = _read_file(os.path.join(proc_root, str(pid), "cgroup"))
+    if text is None:
+        return None
+    for line in text.splitlines():
+        # The unified hierarchy is the entry with hierarchy ID 0 and no controllers
+        if line.startswith("0::"):
+            return line[3:] or "/"
+    return None
+
+
+def parseProcStat(text):
+    """
+    Returns a dictionary with the name, status, memory (RSS in MB) and threads
+    of a process from the contents of its /proc/[pid]/stat file.
+    """
+    # The name may contain spaces and parentheses, so split around the last ')'
+    name = text[text.index("(") + 1:text.rindex(")")]
+    fields = text[text.rindex(")") + 2:].split()
+    return {
+        "name": name,
+        "status": _PROC_STATES.get(fields[0], fields[0]),
+        "memory": round(int(fields[21]) * _PAGE_SIZE / 1024 / 1024, 1),
+        "threads": int(fields[17])
+    }
+
+
+def parseCpuStat(text):
+    """Returns usage_usec from the contents of a cpu.stat file."""
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) == 2 and fields[0] == "usage_usec":
+            return int(fields[1])
+    return None
+
+
+def parseIoStat(text):
+    """Returns (read_bytes, write_bytes) summed over devices from an io.stat file."""
+    read_bytes = write_bytes = 0
+    for line in text.splitlines():
+        for field in line.split()[1:]:
+            key, _, value = field.partition("=")
+            if key == "rbytes":
+                read_bytes += int(value)
+            elif key == "wbytes":
+                write_bytes += int(value)
+    return read_bytes, write_bytes
+
+
+class CgroupMonitor:
+    """
+    Reads per-group totals straight from the cgroup v2 files (cpu.stat,
+    memory.current, io.stat, pids.current), so a refresh costs a few reads
+    per cgroup instead of a walk over every process. Rates are computed from
+    the deltas between two refreshes. Both roots can point at a fake tree.
+    Hosts with only cgroup v1 hierarchies report no groups.
+    """
+
+    def __init__(self, root=DEFAULT_CGROUP_ROOT, proc_root=DEFAULT_PROC_ROOT):
+        # On hybrid hosts the v2 hierarchy is mounted under "unified"
+        unified = os.path.join(root, "unified")
+        if (not os.path.exists(os.path.join(root, "cgroup.controllers")) and
+                os.path.exists(os.path.join(unified, "cgroup.controllers"))):
+            root = unified
+        self.root = root
+        # Without cgroup.controllers the root holds v1 controller hierarchies
+        self.unified = os.path.exists(os.path.join(root, "cgroup.controllers"))
+        self.proc_root = proc_root
+        self._prev = {}  # cgroup path -> (timestamp, usage_usec, read_bytes, write_bytes)
+
+    def _path(self, cgroup, filename):
+        return os.path.join(self.root, cgroup.lstrip("/"), filename)
+
+    def listCgroups(self):
+        """Returns the paths of all cgroups below the root, e.g. "/system.slice"."""
+        if not self.unified:
+            return []
+        cgroups = []
+        for dirpath, _, _ in os.walk(self.root):
+            relative = os.path.relpath(dirpath, self.root)
+            if relative != ".":
+                cgroups.append("/" + relative.replace(os.sep, "/"))
+        return cgroups
+
+    def getCgroups(self, timestamp=None):
+        """
+        Returns a list of dictionaries with each cgroup's CPU% (of all cores),
+        memory (MB), disk read/write speeds (KB/s) and task count.
+        Rates are 0 on the first refresh of a cgroup.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        cpu_count = psutil.cpu_count(logical=True) or 1
+
+        groups = []
+        current = {}
+        for cgroup in self.listCgroups():
+            cpu_text = _read_file(self._path(cgroup, "cpu.stat"))
+            io_text = _read_file(self._path(cgroup, "io.stat"))
+            usage_usec = parseCpuStat(cpu_text) if cpu_text is not None else None
+            read_bytes, write_bytes = parseIoStat(
+                io_text) if io_text is not None else (None, None)
+            current[cgroup] = (timestamp, usage_usec, read_bytes, write_bytes)
+
+            cpu_percent = read_kbps = write_kbps = 0.0
+            prev = self._prev.get(cgroup)
+            if prev is not None and timestamp > prev[0]:
+                elapsed = timestamp - prev[0]
+                if usage_usec is not None and prev[1] is not None:
+                    cpu_percent = (usage_usec - prev[1]) / \
+                        (elapsed * 1e6) * 100 / cpu_count
+                if read_bytes is not None and prev[2] is not None:
+                    read_kbps = (read_bytes - prev[2]) / elapsed / 1024
+                    write_kbps = (write_bytes - prev[3]) / elapsed / 1024
+
+            memory_bytes = _read_int(self._path(cgroup, "memory.current"))
+            groups.append({
+                "cgroup": cgroup,
+                "cpu_percent": round(max(cpu_percent, 0.0), 1),
+                "memory": round(memory_bytes / 1024 / 1024, 1) if memory_bytes is not None else None,
+                "read_kbps": round(max(read_kbps, 0.0), 1),
+                "write_kbps": round(max(write_kbps, 0.0), 1),
+                "tasks": _read_int(self._path(cgroup, "pids.current"))
+            })
+
+        # Cgroups that have been removed are forgotten
+        self._prev = current
+
+        # Sort by CPU usage descending, then memory usage descending
+        groups.sort(key=lambda x: (x["cpu_percent"], x["memory"] or 0), reverse=True)
+        return groups
+
+    def getCgroupPids(self, cgroup):
+        """Returns the PIDs listed in a cgroup's cgroup.procs file."""
+        text = _read_file(self._path(cgroup, "cgroup.procs"))
+        if text is None:
+            return []
+        return [int(line) for line in text.split()]
+
+    def getCgroupProcesses(self, cgroup):
+        """
+        Returns a list of dictionaries describing the member processes of one
+        cgroup (PID, name, status, memory in MB, threads), read from
+        /proc/[pid]/stat under the proc root.
+        """
+        processes = []
+        for pid in self.getCgroupPids(cgroup):
+            process = {"pid": pid, "name": "Unknown", "status": "N/A",
+                       "memory": None, "threads": 0}
+            text = _read_file(os.path.join(self.proc_root, str(pid), "stat"))
+            if text is not None:
+                try:
+                    process.update(parseProcStat(text))
+                except (ValueError, IndexError):
+                    pass  # Malformed or truncated stat file
+            processes.append(process)
+        return processes
+
+    def getPidCgroup(self, pid):
+        """Returns the cgroup v2 path of a process, read under the proc root."""
+        return getPidCgroup(pid, self.proc_root)
@@ -0,0 +1,76 @@
+from collections import namedtuple
+from contextlib import contextmanager
+
+import psutil
+import pytest
+
+import utilities
+
+MemoryInfo = namedtuple("MemoryInfo", ["rss"])
+FullMemoryInfo = namedtuple("FullMemoryInfo", ["rss", "uss", "pss", "swap"])
+
+
+class FakeProcess:
+    """Stands in for psutil.Process and counts the attribute reads."""
+
+    def __init__(self, pid, create_time=1.0, name="proc", rss=1024 * 1024,
+                 denied=()):
+        self.pid = pid
+        self.full_info = FullMemoryInfo(rss, rss // 2, rss // 4, 0)
+        self._create_time = create_time
+        self.denied = denied
+        self.calls = []
+        self.info = {"name": name, "pid": pid, "cpu_percent": 0.0,
+                     "create_time": create_time, "memory_info": MemoryInfo(rss)}
+
+    def _read(self, field, value):
+        self.calls.append(field)
+        if field in self.denied:
+            raise psutil.AccessDenied(self.pid)
+        return value
+
+    def create_time(self):
+        return self._create_time
+
+    @contextmanager
+    def oneshot(self):
+        yield
+
+    def username(self):
+        return self._read("username", "alice")
+
+    def exe(self):
+        return self._read("exe", "/usr/bin/proc")
+
+    def status(self):
+        return self._read("status", "sleeping")
+
+    def nice(self):
+        return self._read("nice", 0)
+
+    def num_threads(self):
+        return self._read("num_threads", 4)
+
+    def ppid(self):
+        return self._read("ppid", 1)
+
+    def memory_full_info(self):
+        return self._read("memory_full_info", self.full_info)
+
+
+@pytest.fixture
+def processes(monkeypatch):
+    """Installs a fake process table; tests add FakeProcess objects to it."""
+    table = {}
+    monkeypatch.setattr(utilities, "_static_details", {})
+
+    def process(pid):
+        if pid not in table:
+            raise psutil.NoSuchProcess(pid)
+        return table[pid]
+
+    monkeypatch.setattr(utilities.psutil, "Process", process)
+    monkeypatch.setattr(utilities.psutil, "process_iter",
+                        lambda attrs=None: list(table.values()))
+    monkeypatch.setattr(utilities.psutil, "cpu_count", lambda logical=True: 1)
+    return table
@@ -0,0 +1,89 @@
+import heapq
+import threading
+import time
+import psutil
+from collections import namedtuple
+
+
+# Deep memory reading of one process, in bytes. Fields the platform does not
+# report (PSS and swap outside Linux) are None.
+DeepMemory = namedtuple("DeepMemory", ["uss", "pss", "swap", "timestamp"])
+
+
+class DeepMemorySampler:
+    """
+    Reads USS/PSS/swap with memory_full_info() for the top-K processes by RSS.
+    Reading them is too expensive for every process every tick, so a background
+    thread refreshes them on a slower schedule and the values are cached per
+    (pid, create_time) in between.
+    """
+
+    def __init__(self, top_k=20, interval=5.0):
+        self.top_k = top_k
+        self.interval = interval
+        # Readings older than this are stale; once a process is no longer a
+        # candidate its reading is dropped when it becomes stale
+        self.stale_age = 2 * interval
+        self._candidates = []
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._stop_event = None
+
+    def start(self):
+        """Starts the background refresh thread, if it is not running."""
+        if self._stop_event is not None:
+            return
+        self._stop_event = threading.Event()
+        threading.Thread(target=self._run, args=(self._stop_event,),
+                         daemon=True).start()
+
+    def stop(self):
+        """Stops the background refresh thread; cached values are kept."""
+        if self._stop_event is not None:
+            self._stop_event.set()
+            self._stop_event = None
+
+    def _run(self, stop_event):
+        while not stop_event.is_set():
+            self.refresh()
+            stop_event.wait(self.interval)
+
+    def update_candidates(self, samples):
+        """
+        Picks the top-K processes by RSS from one tick of ProcessSample records
+        and forgets cached values of processes that have exited, or that have
+        left the top-K and whose reading has gone stale.
+        """
+        top = heapq.nlargest(self.top_k, samples, key=lambda sample: sample.rss)
+        alive = {(sample.pid, sample.create_time) for sample in samples}
+        oldest = time.time() - self.stale_age
+        with self._lock:
+            self._candidates = [(sample.pid, sample.create_time)
+                                for sample in top]
+            candidates = set(self._candidates)
+            for key, reading in list(self._cache.items()):
+                if key not in alive or (key not in candidates and reading.timestamp < oldest):
+                    del self._cache[key]
+
+    def refresh(self):
+        """Reads deep memory for the current candidates."""
+        with self._lock:
+            candidates = list(self._candidates)
+
+        for pid, create_time in candidates:
+            try:
+                proc = psutil.Process(pid)
+                if proc.create_time() != create_time:
+                    continue  # The PID has been reused by another process
+                info = proc.memory_full_info()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            reading = DeepMemory(getattr(info, "uss", None), getattr(info, "pss", None),
+                                 getattr(info, "swap", None), time.time())
+            with self._lock:
+                self._cache[(pid, create_time)] = reading
+
+    def snapshot(self):
+        """Returns a copy of the cached readings keyed by (pid, create_time)."""
+        with self._lock:
+            return dict(self._cache)
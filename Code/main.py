@@ -1,6 +1,6 @@
 import sys
 import os
-from window import PieChartWindow, GraphWindow, MainWindow
+from window import PieChartWindow, GraphWindow, MainWindow, CgroupWindow
 from PyQt5 import QtWidgets, QtGui
 from PyQt5.QtWidgets import QApplication, QMainWindow, QTabWidget
 
@@ -27,11 +27,13 @@ class SystemMonitorApp(QMainWindow):
         self.main_window = MainWindow(self)
         self.piechart_window = PieChartWindow()
         self.graph_window = GraphWindow()
+        self.cgroup_window = CgroupWindow()
 
         # Add the windows to the tab widget
         self.tabs.addTab(self.main_window, "Processes")
         self.tabs.addTab(self.piechart_window, "Charts")
         self.tabs.addTab(self.graph_window, "Graphs")
+        self.tabs.addTab(self.cgroup_window, "cgroups")
 
         # Connect the tab change signal to handle tab focus change
         self.tabs.currentChanged.connect(self.on_tab_change)
@@ -47,12 +49,15 @@ class SystemMonitorApp(QMainWindow):
             self.piechart_window.start_chart_update()
         elif index == 2:  # "Graphs" tab
             self.graph_window.start_graph_update()
+        elif index == 3:  # "cgroups" tab
+            self.cgroup_window.start_cgroup_update()
 
     def stop_all_tabs(self):
         # Stop all monitoring and updating tasks
         self.main_window.stop_monitoring()
         self.piechart_window.stop_chart_update()
         self.graph_window.stop_graph_update()
+        self.cgroup_window.stop_cgroup_update()
 
     def apply_stylesheet(self, stylesheet_path):
         """Apply the stylesheet from the specified file."""
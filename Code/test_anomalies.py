@@ -0,0 +1,110 @@
+import pytest
+
+from anomalies import AnomalyDetector, RollingSlope, parse_rules
+from utilities import ProcessSample
+
+MB = 1024 * 1024
+
+
+def sample(pid, cpu_percent=0.0, rss=100 * MB, create_time=1.0, name="proc"):
+    return ProcessSample(pid, create_time, name, cpu_percent, rss)
+
+
+def test_parse_rules_units():
+    rules = parse_rules("rss_slope > 10 for 10m; cpu > 90 for 60s;; rss > 512 for 1h; cpu > 5 for 30")
+    assert [(rule.metric, rule.threshold, rule.duration) for rule in rules] == [
+        ("rss_slope", 10.0, 600.0),
+        ("cpu", 90.0, 60.0),
+        ("rss", 512.0, 3600.0),
+        ("cpu", 5.0, 30.0)
+    ]
+    assert rules[0].name == "rss_slope > 10 for 10m"
+
+
+@pytest.mark.parametrize("text", [
+    "mem > 5 for 1s",
+    "cpu < 5 for 1s",
+    "cpu > 5",
+    "cpu > 5 for 1d"
+])
+def test_parse_rules_rejects_bad_input(text):
+    with pytest.raises(ValueError):
+        parse_rules(text)
+
+
+def test_rolling_slope_fits_line():
+    slope = RollingSlope(60)
+    assert slope.slope() is None
+    for t in range(0, 61):
+        slope.update(1000 + t, 5 + 2 * t)
+    assert slope.slope() == pytest.approx(2.0)
+    assert slope.span() == 60
+    assert slope.rising()
+
+
+def test_rolling_slope_evicts_old_buckets():
+    slope = RollingSlope(60, buckets=6)
+    for t in range(0, 300):
+        # Flat for the first 200 s, then rising; the flat part must age out
+        slope.update(t, 0 if t < 200 else t - 200)
+    assert len(slope.buckets) <= 7
+    assert slope.totals[0] == sum(bucket[2] for bucket in slope.buckets)
+    assert slope.slope() == pytest.approx(1.0)
+    assert 60 <= slope.span() < 70
+
+
+def test_cpu_rule_needs_full_duration():
+    detector = AnomalyDetector(parse_rules("cpu > 90 for 60s"))
+    fired_at = []
+    for t in range(0, 90):
+        if detector.update([sample(1, cpu_percent=200)], timestamp=t):
+            fired_at.append(t)
+    # The EWMA starts at the first sample, so the rule holds from t=0
+    assert fired_at == [60]
+    assert detector.active_pids() == {1}
+
+
+def test_cpu_rule_resets_when_condition_breaks():
+    detector = AnomalyDetector(parse_rules("cpu > 50 for 10s"))
+    for t in range(0, 8):
+        assert not detector.update([sample(1, cpu_percent=100)], timestamp=t)
+    for t in range(8, 20):
+        detector.update([sample(1, cpu_percent=0)], timestamp=t)
+    assert not detector.active_pids()
+
+
+def test_rss_slope_rule_fires_after_window():
+    detector = AnomalyDetector(parse_rules("rss_slope > 10 for 10m"))
+    fired_at = []
+    for t in range(0, 700):
+        # 20 MB/min
+        if detector.update([sample(1, rss=100 * MB + t * MB / 3)], timestamp=t):
+            fired_at.append(t)
+    assert fired_at == [600]
+
+
+def test_rss_slope_rule_ignores_single_jump():
+    detector = AnomalyDetector(parse_rules("rss_slope > 10 for 10m"))
+    for t in range(0, 900):
+        rss = 100 * MB if t < 300 else 250 * MB
+        assert not detector.update([sample(1, rss=rss)], timestamp=t)
+
+
+def test_processes_are_keyed_by_pid_and_create_time():
+    detector = AnomalyDetector(parse_rules("cpu > 90 for 10s"))
+    for t in range(0, 10):
+        detector.update([sample(1, cpu_percent=200)], timestamp=t)
+    # Same PID, new process: its state starts over
+    for t in range(10, 15):
+        assert not detector.update(
+            [sample(1, cpu_percent=200, create_time=2.0)], timestamp=t)
+    assert list(detector.trackers) == [(1, 2.0)]
+
+
+def test_gap_resets_state():
+    detector = AnomalyDetector(parse_rules("cpu > 90 for 60s"), max_gap=10)
+    for t in range(0, 5):
+        detector.update([sample(1, cpu_percent=200)], timestamp=t)
+    # After a 2 minute gap the rule has to hold for 60 s again
+    assert not detector.update([sample(1, cpu_percent=200)], timestamp=125)
+    assert not detector.active_pids()
@@ -0,0 +1,94 @@
+import cgroups
+from cgroups import CgroupMonitor, getPidCgroup
+
+
+def write(root, path, text):
+    file = root / path
+    file.parent.mkdir(parents=True, exist_ok=True)
+    file.write_text(text)
+
+
+def make_tree(tmp_path):
+    """Builds a fake cgroup v2 tree and a fake /proc next to it."""
+    cgroup_root = tmp_path / "cgroup"
+    proc_root = tmp_path / "proc"
+    write(cgroup_root, "cgroup.controllers", "cpu io memory pids\n")
+    write(cgroup_root, "system.slice/cpu.stat",
+          "usage_usec 1000000\nuser_usec 600000\nsystem_usec 400000\n")
+    write(cgroup_root, "system.slice/memory.current", "104857600\n")
+    write(cgroup_root, "system.slice/io.stat",
+          "8:0 rbytes=1024 wbytes=2048 rios=1 wios=2\n8:16 rbytes=1024 wbytes=0\n")
+    write(cgroup_root, "system.slice/pids.current", "3\n")
+    write(cgroup_root, "system.slice/web.service/cgroup.procs", "42\n43\n")
+    write(proc_root, "42/stat",
+          "42 (nginx: worker) S 1 42 42 0 -1 0 0 0 0 0 0 0 0 0 20 0 4 0 1 1000 512 0\n")
+    write(proc_root, "42/cgroup", "0::/system.slice/web.service\n")
+    return cgroup_root, proc_root
+
+
+def test_get_cgroups_rates_from_deltas(tmp_path, monkeypatch):
+    monkeypatch.setattr(cgroups.psutil, "cpu_count", lambda logical=True: 2)
+    cgroup_root, proc_root = make_tree(tmp_path)
+    monitor = CgroupMonitor(str(cgroup_root), str(proc_root))
+
+    first = {group["cgroup"]: group for group in monitor.getCgroups(timestamp=100)}
+    assert set(first) == {"/system.slice", "/system.slice/web.service"}
+    assert first["/system.slice"]["cpu_percent"] == 0.0
+    assert first["/system.slice"]["memory"] == 100.0
+    assert first["/system.slice"]["tasks"] == 3
+
+    # 2 s of CPU over 2 s on 2 cores, 10 KB read over 2 s
+    write(cgroup_root, "system.slice/cpu.stat", "usage_usec 3000000\n")
+    write(cgroup_root, "system.slice/io.stat",
+          "8:0 rbytes=11264 wbytes=2048\n8:16 rbytes=1024 wbytes=0\n")
+    second = {group["cgroup"]: group for group in monitor.getCgroups(timestamp=102)}
+    assert second["/system.slice"]["cpu_percent"] == 50.0
+    assert second["/system.slice"]["read_kbps"] == 5.0
+    assert second["/system.slice"]["write_kbps"] == 0.0
+    assert second["/system.slice/web.service"]["memory"] is None
+
+
+def test_get_pid_cgroup(tmp_path):
+    _, proc_root = make_tree(tmp_path)
+    write(proc_root, "7/cgroup", "12:memory:/legacy\n0::/user.slice/session-1.scope\n")
+    write(proc_root, "8/cgroup", "4:memory:/legacy\n")
+
+    assert getPidCgroup(42, str(proc_root)) == "/system.slice/web.service"
+    assert getPidCgroup(7, str(proc_root)) == "/user.slice/session-1.scope"
+    assert getPidCgroup(8, str(proc_root)) is None
+    assert getPidCgroup(9, str(proc_root)) is None
+
+
+def test_get_cgroup_processes_reads_fake_proc(tmp_path):
+    cgroup_root, proc_root = make_tree(tmp_path)
+    monitor = CgroupMonitor(str(cgroup_root), str(proc_root))
+
+    members = monitor.getCgroupProcesses("/system.slice/web.service")
+    assert [member["pid"] for member in members] == [42, 43]
+    assert members[0]["name"] == "nginx: worker"
+    assert members[0]["status"] == "sleeping"
+    assert members[0]["threads"] == 4
+    assert members[0]["memory"] == round(512 * cgroups._PAGE_SIZE / 1024 / 1024, 1)
+    # PID 43 has no stat file, so it keeps the defaults
+    assert members[1]["name"] == "Unknown"
+    assert monitor.getPidCgroup(42) == "/system.slice/web.service"
+
+
+def test_cgroup_v1_host_has_no_groups(tmp_path):
+    cgroup_root = tmp_path / "cgroup"
+    write(cgroup_root, "cpu/cpu.shares", "1024\n")
+    write(cgroup_root, "memory/docker/abc/memory.usage_in_bytes", "4096\n")
+    monitor = CgroupMonitor(str(cgroup_root), str(tmp_path / "proc"))
+
+    assert monitor.listCgroups() == []
+    assert monitor.getCgroups(timestamp=100) == []
+
+
+def test_hybrid_host_uses_unified_mount(tmp_path):
+    cgroup_root = tmp_path / "cgroup"
+    write(cgroup_root, "cpu/cpu.shares", "1024\n")
+    write(cgroup_root, "unified/cgroup.controllers", "\n")
+    write(cgroup_root, "unified/init.scope/memory.current", "1048576\n")
+    monitor = CgroupMonitor(str(cgroup_root), str(tmp_path / "proc"))
+
+    assert monitor.listCgroups() == ["/init.scope"]
@@ -0,0 +1,78 @@
+import deepmemory
+from conftest import FakeProcess
+from deepmemory import DeepMemorySampler
+from utilities import ProcessSample, getProcesses
+
+MB = 1024 * 1024
+
+
+def samples_of(table):
+    return [ProcessSample(proc.pid, proc.create_time(), proc.info["name"], 0.0,
+                          proc.info["memory_info"].rss) for proc in table.values()]
+
+
+def test_non_candidates_are_evicted_once_stale(processes, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(deepmemory.time, "time", lambda: now[0])
+    processes[10] = FakeProcess(10, rss=10 * MB)
+    processes[11] = FakeProcess(11, rss=1 * MB)
+    sampler = DeepMemorySampler(top_k=1, interval=5.0)
+
+    sampler.update_candidates(samples_of(processes))
+    sampler.refresh()
+    assert set(sampler.snapshot()) == {(10, 1.0)}
+
+    # PID 11 overtakes PID 10; the fresh reading of 10 is kept for now
+    processes[11] = FakeProcess(11, rss=20 * MB)
+    now[0] += 5
+    sampler.update_candidates(samples_of(processes))
+    sampler.refresh()
+    assert set(sampler.snapshot()) == {(10, 1.0), (11, 1.0)}
+
+    # Past stale_age the reading of 10 is dropped, 11 is refreshed and kept
+    now[0] += sampler.stale_age
+    sampler.refresh()
+    sampler.update_candidates(samples_of(processes))
+    assert set(sampler.snapshot()) == {(11, 1.0)}
+
+    # Exited processes are dropped right away
+    del processes[11]
+    sampler.update_candidates(samples_of(processes))
+    assert sampler.snapshot() == {}
+
+
+def test_reused_pid_is_skipped(processes):
+    sampler = DeepMemorySampler(top_k=5)
+    processes[10] = FakeProcess(10, create_time=1.0, rss=10 * MB)
+    sampler.update_candidates(samples_of(processes))
+
+    # The process exits and its PID is reused before the refresh
+    proc = processes[10] = FakeProcess(10, create_time=2.0, rss=10 * MB)
+    sampler.refresh()
+    assert sampler.snapshot() == {}
+    assert proc.calls == []
+
+
+def test_get_processes_reports_coverage(processes):
+    processes[10] = FakeProcess(10, name="worker", rss=30 * MB)
+    processes[11] = FakeProcess(11, name="worker", rss=20 * MB)
+    processes[12] = FakeProcess(12, name="worker", rss=1 * MB)
+    processes[13] = FakeProcess(13, name="db", rss=5 * MB)
+    sampler = DeepMemorySampler(top_k=2)
+
+    samples = []
+    getProcesses(samples, detail_fields=(), deep_memory=sampler)
+    sampler.update_candidates(samples)
+    sampler.refresh()
+
+    result = {proc["name"]: proc for proc in
+              getProcesses(detail_fields=(), deep_memory=sampler)}
+    worker, db = result["worker"], result["db"]
+    assert worker["deep_memory_coverage"] == "2/3"
+    assert worker["deep_memory_partial"]
+    # FakeProcess reports PSS as a quarter of RSS
+    assert worker["pss"] == 12.5
+    assert worker["uss"] == 25.0
+    assert db["deep_memory_coverage"] is None
+    assert db["pss"] is None
+    assert db["deep_memory_partial"]
@@ -0,0 +1,49 @@
+import utilities
+from conftest import FakeProcess
+from utilities import getProcessDetails, getProcesses
+
+
+def test_static_details_are_cached(processes):
+    proc = processes[10] = FakeProcess(10)
+
+    first = getProcessDetails(10, 1.0, ("user", "executable_path", "threads"))
+    assert first == {"user": "alice", "executable_path": "/usr/bin/proc", "threads": 4}
+
+    proc.calls.clear()
+    second = getProcessDetails(10, 1.0, ("user", "executable_path", "threads"))
+    assert second == first
+    # Only the dynamic field is read again
+    assert proc.calls == ["num_threads"]
+
+
+def test_reused_pid_returns_defaults(processes):
+    proc = processes[10] = FakeProcess(10, create_time=2.0)
+
+    details = getProcessDetails(10, 1.0, ("user", "status"))
+    assert details == {"user": "Unknown", "status": "N/A"}
+    assert proc.calls == []
+    assert utilities._static_details == {}
+
+
+def test_access_denied_static_field_caches_default(processes):
+    proc = processes[10] = FakeProcess(10, denied=("exe", "nice"))
+
+    details = getProcessDetails(10, 1.0, ("executable_path", "priority"))
+    assert details == {"executable_path": "N/A", "priority": "Normal"}
+
+    proc.calls.clear()
+    getProcessDetails(10, 1.0, ("executable_path", "priority"))
+    # exe() is not retried; nice() is dynamic and is
+    assert proc.calls == ["nice"]
+
+
+def test_get_processes_prunes_exited_processes(processes):
+    processes[10] = FakeProcess(10, name="web")
+    processes[11] = FakeProcess(11, name="db")
+    getProcesses(detail_fields=("user",))
+    assert set(utilities._static_details) == {(10, 1.0), (11, 1.0)}
+
+    del processes[11]
+    result = getProcesses(detail_fields=())
+    assert [proc["name"] for proc in result] == ["web"]
+    assert set(utilities._static_details) == {(10, 1.0)}
@@ -2,7 +2,14 @@ from datetime import datetime
 import psutil
 import os
 import time
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+from cgroups import getPidCgroup
+
+
+# Per-process sample fed to consumers such as the anomaly detector.
+# cpu_percent is relative to one core and rss is in bytes.
+ProcessSample = namedtuple(
+    "ProcessSample", ["pid", "create_time", "name", "cpu_percent", "rss"])
 
 
 def getSystemStats():
@@ -76,90 +83,180 @@ def getDiskRunInfo():
     }
 
 
-def getProcesses():
+# Attributes that are fetched per row, only for rows the user can see
+DETAIL_FIELDS = ("user", "status", "priority", "threads",
+                 "executable_path", "parent_pid")
+
+# Detail attributes that never change for a given (pid, create_time)
+STATIC_DETAIL_FIELDS = ("user", "executable_path")
+
+DETAIL_DEFAULTS = {
+    "user": "Unknown",
+    "status": "N/A",
+    "priority": "Normal",
+    "threads": 0,
+    "executable_path": "N/A",
+    "parent_pid": "N/A"
+}
+
+_DETAIL_GETTERS = {
+    "user": lambda proc: proc.username(),
+    "status": lambda proc: proc.status(),
+    "priority": lambda proc: proc.nice(),
+    "threads": lambda proc: proc.num_threads(),
+    "executable_path": lambda proc: proc.exe(),
+    "parent_pid": lambda proc: proc.ppid()
+}
+
+_static_details = {}  # (pid, create_time) -> cached static attributes
+
+
+def getProcessDetails(pid, create_time, fields=DETAIL_FIELDS):
+    """
+    Returns a dictionary with the requested detail attributes of one process.
+    Static attributes are cached per (pid, create_time), so they are read once
+    per process lifetime. Unreadable attributes fall back to their defaults.
+    """
+    details = {field: DETAIL_DEFAULTS[field] for field in fields}
+    cache = _static_details.get((pid, create_time), {})
+    missing = []
+    for field in fields:
+        if field in cache:
+            details[field] = cache[field]
+        else:
+            missing.append(field)
+    if not missing:
+        return details
+
+    try:
+        proc = psutil.Process(pid)
+        if proc.create_time() != create_time:
+            return details  # The PID has been reused by another process
+        cache = _static_details.setdefault((pid, create_time), cache)
+        with proc.oneshot():
+            for field in missing:
+                try:
+                    value = _DETAIL_GETTERS[field](proc)
+                except psutil.AccessDenied:
+                    # Static fields stay unreadable, so do not retry every tick
+                    if field in STATIC_DETAIL_FIELDS:
+                        cache[field] = DETAIL_DEFAULTS[field]
+                    continue
+                details[field] = value if value or value == 0 else DETAIL_DEFAULTS[field]
+                if field in STATIC_DETAIL_FIELDS:
+                    cache[field] = details[field]
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        pass
+
+    if details.get("parent_pid") == 0:
+        details["parent_pid"] = "N/A"
+    return details
+
+
+def getProcesses(samples=None, detail_fields=DETAIL_FIELDS, deep_memory=None):
     """
     Returns a list of main processes (grouped by name) with aggregated CPU%, memory (MB/KB),
     and the PID of the first process in each group, along with additional info like memory unit.
+    Only the cheap sort keys are read for every process; the `detail_fields` are then read
+    for the first process of each group. Pass an empty tuple and use getProcessDetails()
+    to fetch details lazily for the rows that are actually displayed.
+    If a `samples` list is given, one ProcessSample per process is appended to it.
+    If a DeepMemorySampler (deepmemory.py) is given, its cached USS/PSS/swap (MB) are summed per group along
+    with the age in seconds of the oldest reading; groups without readings get None. The
+    coverage ("sampled/members") tells whether the sums include every process of the group.
     """
     cpu_count = psutil.cpu_count(
         logical=True)  # Get the number of logical CPU cores
-    process_data = defaultdict(lambda: {"cpu_percent": 0.0, "memory": 0.0, "memory_unit": "MB", "pid": None,
-                                        "user": "Unknown", "status": "N/A", "disk_io_read_write": "N/A",
-                                        "network_io_receive_send": "N/A", "priority": "Normal",
-                                        "threads": 0, "uptime": "N/A", "executable_path": "N/A",
-                                        "parent_pid": None, "process_type": "N/A"})
-
-    for proc in psutil.process_iter(['name', 'pid', 'cpu_percent', 'username', 'status', 'num_threads', 'exe', 'create_time']):
-        try:
-            proc_name = proc.info['name'] or "Unknown"
-            if process_data[proc_name]["pid"] is None:
-                # Store the first PID
-                process_data[proc_name]["pid"] = proc.info['pid']
-
-            process_data[proc_name]["cpu_percent"] += proc.info['cpu_percent'] / \
-                (cpu_count or 1)
-
-            memory_info = proc.memory_info()
-            memory_bytes = memory_info.rss
-            if memory_bytes >= 1024 * 1024:  # If memory is greater than or equal to 1 MB
-                memory_mb = memory_bytes / 1024 / 1024  # Convert to MB
-                process_data[proc_name]["memory"] += memory_mb
-                process_data[proc_name]["memory_unit"] = "MB"  # Set unit as MB
-            else:
-                memory_kb = memory_bytes / 1024  # Convert to KB if less than 1 MB
-                process_data[proc_name]["memory"] += memory_kb
-                process_data[proc_name]["memory_unit"] = "KB"  # Set unit as KB
-
-            process_data[proc_name]["user"] = proc.info['username'] or "Unknown"
-            process_data[proc_name]["status"] = proc.info['status'] or "N/A"
-            process_data[proc_name]["threads"] = proc.info['num_threads'] or 0
-            process_data[proc_name]["executable_path"] = proc.info['exe'] or "N/A"
-
-            # Handle parent process separately
-            parent_proc = proc.parent()  # Access the parent process
-            process_data[proc_name]["parent_pid"] = parent_proc.pid if parent_proc else "N/A"
-
-            # Disk I/O (Placeholder, requires more advanced methods to gather per-process I/O)
-            process_data[proc_name]["disk_io_read_write"] = "N/A"
-
-            # Network I/O (Placeholder, requires more advanced methods to gather per-process I/O)
-            process_data[proc_name]["network_io_receive_send"] = "N/A"
-
-            # Process priority
-            # Get the process priority using nice value
-            process_data[proc_name]["priority"] = proc.nice()
-
-            # Process uptime (current time - process start time)
-            uptime_seconds = int(
-                datetime.now().timestamp() - proc.info['create_time'])
-            process_data[proc_name]["uptime"] = f"{uptime_seconds} seconds"
-
-            # Process type (e.g., whether it’s a system or user process)
-            process_data[proc_name]["process_type"] = "N/A"  # Placeholder
-
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess, AttributeError):
-            continue
+    process_data = defaultdict(lambda: {"cpu_percent": 0.0, "memory": 0.0, "memory_unit": "MB",
+                                        "pid": None, "create_time": None,
+                                        "uss": None, "pss": None, "swap": None,
+                                        "deep_memory_time": None,
+                                        "members": 0, "deep_memory_sampled": 0})
+    seen = set()
+    deep_readings = deep_memory.snapshot() if deep_memory is not None else {}
+
+    for proc in psutil.process_iter(['name', 'pid', 'cpu_percent', 'create_time', 'memory_info']):
+        memory_info = proc.info['memory_info']
+        if memory_info is None:
+            continue  # Access denied or process gone
+
+        proc_name = proc.info['name'] or "Unknown"
+        seen.add((proc.info['pid'], proc.info['create_time']))
+        if process_data[proc_name]["pid"] is None:
+            # Store the first PID
+            process_data[proc_name]["pid"] = proc.info['pid']
+            process_data[proc_name]["create_time"] = proc.info['create_time']
+
+        process_data[proc_name]["members"] += 1
+
+        cpu_percent = proc.info['cpu_percent'] or 0.0
+        process_data[proc_name]["cpu_percent"] += cpu_percent / \
+            (cpu_count or 1)
+
+        memory_bytes = memory_info.rss
+
+        reading = deep_readings.get((proc.info['pid'], proc.info['create_time']))
+        if reading is not None:
+            stats = process_data[proc_name]
+            stats["deep_memory_sampled"] += 1
+            for field in ("uss", "pss", "swap"):
+                value = getattr(reading, field)
+                if value is not None:
+                    stats[field] = (stats[field] or 0) + value / 1024 / 1024
+            if stats["deep_memory_time"] is None or reading.timestamp < stats["deep_memory_time"]:
+                stats["deep_memory_time"] = reading.timestamp
+
+        if samples is not None:
+            samples.append(ProcessSample(proc.info['pid'], proc.info['create_time'],
+                                         proc_name, cpu_percent, memory_bytes))
+
+        if memory_bytes >= 1024 * 1024:  # If memory is greater than or equal to 1 MB
+            memory_mb = memory_bytes / 1024 / 1024  # Convert to MB
+            process_data[proc_name]["memory"] += memory_mb
+            process_data[proc_name]["memory_unit"] = "MB"  # Set unit as MB
+        else:
+            memory_kb = memory_bytes / 1024  # Convert to KB if less than 1 MB
+            process_data[proc_name]["memory"] += memory_kb
+            process_data[proc_name]["memory_unit"] = "KB"  # Set unit as KB
+
+    # Forget cached attributes of processes that have exited
+    for key in _static_details.keys() - seen:
+        del _static_details[key]
+
+    now = datetime.now().timestamp()
 
     # Convert the aggregated data to a list of dictionaries
     processes = []
     for name, stats in process_data.items():
-        processes.append({
+        process = {
             "pid": stats["pid"],
+            "create_time": stats["create_time"],
             "name": name,
             "cpu_percent": round(stats["cpu_percent"], 1),
             "memory": round(stats["memory"]),  # Memory in MB/KB
             "memory_unit": stats["memory_unit"],  # Memory unit (MB/KB)
-            "user": stats["user"],
-            "status": stats["status"],
-            "disk_io_read_write": stats["disk_io_read_write"],
-            "network_io_receive_send": stats["network_io_receive_send"],
-            "priority": stats["priority"],
-            "threads": stats["threads"],
-            "uptime": stats["uptime"],
-            "executable_path": stats["executable_path"],
-            "parent_pid": stats["parent_pid"],
-            "process_type": stats["process_type"]
-        })
+            # Disk and network I/O are placeholders, they require more advanced
+            # methods to gather per-process I/O
+            "disk_io_read_write": "N/A",
+            "network_io_receive_send": "N/A",
+            # Process uptime (current time - process start time)
+            "uptime": f"{int(now - (stats['create_time'] or now))} seconds",
+            # Process type (e.g., whether it's a system or user process)
+            "process_type": "N/A",  # Placeholder
+            # Deep memory in MB, only for groups with sampled processes
+            "uss": _round_or_none(stats["uss"]),
+            "pss": _round_or_none(stats["pss"]),
+            "swap": _round_or_none(stats["swap"]),
+            "deep_memory_age": (int(now - stats["deep_memory_time"])
+                                if stats["deep_memory_time"] is not None else None),
+            "deep_memory_coverage": (f"{stats['deep_memory_sampled']}/{stats['members']}"
+                                     if stats["deep_memory_sampled"] else None),
+            "deep_memory_partial": stats["deep_memory_sampled"] < stats["members"]
+        }
+        process.update(DETAIL_DEFAULTS)
+        process.update(getProcessDetails(
+            stats["pid"], stats["create_time"], detail_fields))
+        processes.append(process)
 
     # Sort by CPU usage descending, then memory usage descending
     processes.sort(key=lambda x: (x["cpu_percent"], x["memory"]), reverse=True)
@@ -167,6 +264,10 @@ def getProcesses():
     return processes
 
 
+def _round_or_none(value):
+    return round(value, 1) if value is not None else None
+
+
 def update_system_data(cpu_data, ram_data, disk_data):
     """
     Updates the system stats data (CPU, RAM, Disk) for graphs or any other use.
@@ -235,6 +336,7 @@ def show_details(pid):
             'memory_info': format_memory(process.memory_info().rss),
             'create_time': process.create_time(),
             'cmdline': process.cmdline(),
+            'cgroup': getPidCgroup(pid) or "N/A",
         }
         return details
     except psutil.NoSuchProcess:
@@ -1,11 +1,43 @@
-from PyQt5.QtWidgets import QWidget, QGridLayout, QVBoxLayout, QTableWidgetItem, QMenu, QTableWidget, QSizePolicy, QHeaderView, QAbstractItemView, QMessageBox
-from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QWidget, QGridLayout, QVBoxLayout, QTableWidgetItem, QMenu, QTableWidget, QSizePolicy, QHeaderView, QAbstractItemView, QMessageBox, QListWidget
+from PyQt5.QtCore import QTimer, QSettings
 from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor
 import os
 from PyQt5 import QtCore
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from utilities import get_network_stats, getDiskInfo, getDiskRunInfo, getProcesses, getSystemStats, kill_process, show_details, format_memory, update_system_data
+from cgroups import CgroupMonitor
+from deepmemory import DeepMemorySampler
+from anomalies import AnomalyDetector, DEFAULT_RULES, format_alert, parse_rules
+from utilities import DETAIL_FIELDS, get_network_stats, getDiskInfo, getDiskRunInfo, getProcessDetails, getProcesses, getSystemStats, kill_process, show_details, format_memory, update_system_data
+
+
+# Processes table columns: (header, process key, default width)
+PROCESS_COLUMNS = [
+    ("PID", "pid", 60),
+    ("Process Name", "name", 140),
+    ("User/Owner", "user", 120),
+    ("Status", "status", 80),
+    ("CPU %", "cpu_percent", 60),
+    ("Memory", "memory", 80),
+    ("MB/KB", "memory_unit", 70),
+    ("Disk I/O (Read/Write)", "disk_io_read_write", 200),
+    ("Network I/O (Receive/Send)", "network_io_receive_send", 100),
+    ("Priority", "priority", 80),
+    ("Threads", "threads", 90),
+    ("Uptime", "uptime", 100),
+    ("Executable Path", "executable_path", 300),
+    ("Parent PID (PPID)", "parent_pid", 120),
+    ("Process Type", "process_type", 120),
+    ("USS (MB)", "uss", 80),
+    ("PSS (MB)", "pss", 80),
+    ("Swap (MB)", "swap", 80),
+    ("Deep Mem Age (s)", "deep_memory_age", 130),
+    ("Deep Mem Coverage", "deep_memory_coverage", 140)
+]
+
+DEEP_MEMORY_KEYS = ("uss", "pss", "swap", "deep_memory_age",
+                    "deep_memory_coverage")
 
 
 class MainWindow(QWidget):
@@ -14,12 +46,9 @@ class MainWindow(QWidget):
 
         self.system_monitor_app = system_monitor_app
         self.tableWidget = QTableWidget(self)
-        self.tableWidget.setColumnCount(15)
+        self.tableWidget.setColumnCount(len(PROCESS_COLUMNS))
         self.tableWidget.setHorizontalHeaderLabels(
-            ['PID', 'Process Name', 'User/Owner', 'Status', 'CPU %', 'Memory', 'MB/KB',
-             'Disk I/O (Read/Write)', 'Network I/O (Receive/Send)',
-             'Priority', 'Threads', 'Uptime', 'Executable Path', 'Parent PID (PPID)', 'Process Type']
-        )
+            [header for header, _, _ in PROCESS_COLUMNS])
 
         self.tableWidget.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.tableWidget.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -42,23 +71,53 @@ class MainWindow(QWidget):
         header.setSectionResizeMode(QHeaderView.Interactive)
 
         # Set fixed column widths
-        column_widths = [60, 140, 120, 80, 60, 80,     # PID, Process Name, User/Owner, Status, CPU %, Memory
-                         # Disk I/O, Network I/O, GPU %, Priority, Threads, Uptime
-                         70, 200, 100, 80, 90, 100,
-                         300, 120, 120]
-        for i, width in enumerate(column_widths):
+        for i, (_, _, width) in enumerate(PROCESS_COLUMNS):
             self.tableWidget.setColumnWidth(i, width)
 
         # Optionally restore vertical header (styled for minimal impact)
         self.tableWidget.verticalHeader().setVisible(True)
         self.tableWidget.verticalHeader().setDefaultSectionSize(25)
 
+        self.settings = QSettings("CrossTaskManager", "CrossTaskManager")
+
+        # Right-click the header to show/hide columns; the choice is persisted
+        header.setContextMenuPolicy(Qt.CustomContextMenu)
+        header.customContextMenuRequested.connect(self.open_column_menu)
+        hidden_columns = self.settings.value(
+            "processes/hidden_columns", [], type=list)
+        for col, (_, key, _) in enumerate(PROCESS_COLUMNS):
+            self.tableWidget.setColumnHidden(col, key in hidden_columns)
+
+        # Details are fetched lazily for rows scrolled into view
+        self.tableWidget.verticalScrollBar().valueChanged.connect(
+            self.fill_visible_details)
+        header.sortIndicatorChanged.connect(self.on_sort_changed)
+
+        # Alert rules are configurable through the "alerts/rules" setting
+        rules_text = self.settings.value("alerts/rules", DEFAULT_RULES)
+        try:
+            rules = parse_rules(rules_text)
+        except ValueError as error:
+            print(f"Error: {error}. Falling back to default alert rules.")
+            rules = parse_rules(DEFAULT_RULES)
+        self.detector = AnomalyDetector(rules)
+
+        # USS/PSS/swap of the top consumers, refreshed in the background
+        self.deep_memory = DeepMemorySampler()
+        self.deep_memory.start()
+
+        # Notification log for fired alerts, newest first
+        self.alertLog = QListWidget(self)
+        self.alertLog.setMaximumHeight(120)
+
         layout = QVBoxLayout(self)
         layout.addWidget(self.tableWidget)
+        layout.addWidget(self.alertLog)
         self.setLayout(layout)
         self.resize(800, 600)
 
         # Timer to update the process list
+        self.monitoring = True
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_processes)
         self.timer.start(3000)  # Update every 3 second
@@ -66,71 +125,156 @@ class MainWindow(QWidget):
         self.update_processes()
 
     def start_monitoring(self):
+        self.monitoring = True
         self.timer.start(1000)  # Update chart every second
+        self.deep_memory.start()
 
     def stop_monitoring(self):
-        self.timer.stop()
+        # Sampling keeps running so the alert rules see an unbroken stream;
+        # only the table refresh and deep memory sampling pause
+        self.monitoring = False
+        self.deep_memory.stop()
 
     def update_processes(self):
-        # Get the processes from the external function
-        processes = getProcesses()
+        # Get the processes from the external function. Details are fetched
+        # for visible rows only, except the sort column which every row needs
+        sort_field = self.sort_detail_field() if self.monitoring else None
+        samples = []
+        processes = getProcesses(
+            samples, detail_fields=(sort_field,) if sort_field else (),
+            deep_memory=self.deep_memory)
+        self.deep_memory.update_candidates(samples)
+
+        # Feed the per-process samples to the alert rules
+        for alert in self.detector.update(samples):
+            self.alertLog.insertItem(0, format_alert(alert))
+        while self.alertLog.count() > self.detector.log.maxlen:
+            self.alertLog.takeItem(self.alertLog.count() - 1)
+        alerting_names = self.detector.active_names()
+
+        if not self.monitoring:
+            return
+
+        # Stale deep memory readings, and sums that miss some processes of
+        # the group, are shown greyed out
+        stale_age = self.deep_memory.stale_age
 
         self.tableWidget.setUpdatesEnabled(False)
+        # Keep rows in place while filling; the table re-sorts when re-enabled
+        self.tableWidget.setSortingEnabled(False)
 
         # Update the table in the main window with the current processes
         self.tableWidget.setRowCount(len(processes))
         for row, proc in enumerate(processes):
-            # Use setData with Qt.EditRole for proper numeric sorting
-            item_pid = QTableWidgetItem()
-            item_pid.setData(Qt.EditRole, proc["pid"])
-            self.tableWidget.setItem(row, 0, item_pid)
-
-            self.tableWidget.setItem(row, 1, QTableWidgetItem(proc["name"]))
-            self.tableWidget.setItem(row, 2, QTableWidgetItem(proc["user"]))
-            self.tableWidget.setItem(row, 3, QTableWidgetItem(proc["status"]))
-
-            # Set CPU usage with '%' unit
-            item_cpu = QTableWidgetItem()
-            # Append '%' for CPU usage
-            item_cpu.setData(Qt.EditRole, proc['cpu_percent'])
-            self.tableWidget.setItem(row, 4, item_cpu)
-
-            # Set memory usage with appropriate unit (e.g., MB or GB)
-            item_memory = QTableWidgetItem()
-            # Assuming proc["memory_unit"] contains the unit, e.g., 'MB', 'GB'
-            # Add the memory unit
-            item_memory.setData(
-                Qt.EditRole, proc['memory'])
-            self.tableWidget.setItem(row, 5, item_memory)
-
-            self.tableWidget.setItem(
-                row, 6, QTableWidgetItem(proc["memory_unit"]))
-
-            self.tableWidget.setItem(
-                row, 7, QTableWidgetItem(proc["disk_io_read_write"]))
-            self.tableWidget.setItem(
-                row, 8, QTableWidgetItem(proc["network_io_receive_send"]))
-
-            self.tableWidget.setItem(
-                row, 9, QTableWidgetItem(proc["priority"]))
-
-            item_threads = QTableWidgetItem()
-            item_threads.setData(Qt.EditRole, proc["threads"])
-            self.tableWidget.setItem(row, 10, item_threads)
-
-            self.tableWidget.setItem(row, 11, QTableWidgetItem(proc["uptime"]))
-            self.tableWidget.setItem(
-                row, 12, QTableWidgetItem(proc["executable_path"]))
-
-            item_ppid = QTableWidgetItem()
-            item_ppid.setData(Qt.EditRole, proc["parent_pid"])
-            self.tableWidget.setItem(row, 13, item_ppid)
-
-            self.tableWidget.setItem(
-                row, 14, QTableWidgetItem(proc["process_type"]))
+            for col, (_, key, _) in enumerate(PROCESS_COLUMNS):
+                # Use setData with Qt.EditRole for proper numeric sorting
+                item = QTableWidgetItem()
+                item.setData(Qt.EditRole, proc[key])
+                # Highlight groups with a process that matches an alert rule
+                if proc["name"] in alerting_names:
+                    item.setBackground(QColor("#c0392b"))
+                if key in DEEP_MEMORY_KEYS and (proc["deep_memory_age"] is None or
+                                                proc["deep_memory_age"] > stale_age or
+                                                proc["deep_memory_partial"]):
+                    item.setForeground(QColor("#7f8c8d"))
+                self.tableWidget.setItem(row, col, item)
+
+            # Remember which process to read the details of
+            self.tableWidget.item(row, 0).setData(
+                Qt.UserRole, proc["create_time"])
 
+        self.tableWidget.setSortingEnabled(True)
+        self.fill_visible_details()
         self.tableWidget.setUpdatesEnabled(True)
 
+    def sort_detail_field(self):
+        """Returns the detail field the table is sorted by, or None."""
+        key = PROCESS_COLUMNS[
+            self.tableWidget.horizontalHeader().sortIndicatorSection()][1]
+        return key if key in DETAIL_FIELDS else None
+
+    def on_sort_changed(self):
+        # Sorting on a detail column needs its real value in every row
+        sort_field = self.sort_detail_field()
+        if sort_field is not None:
+            col = self.tableWidget.horizontalHeader().sortIndicatorSection()
+            self.tableWidget.setSortingEnabled(False)
+            for row in range(self.tableWidget.rowCount()):
+                pid_item = self.tableWidget.item(row, 0)
+                details = getProcessDetails(
+                    pid_item.data(Qt.EditRole), pid_item.data(Qt.UserRole), (sort_field,))
+                self.tableWidget.item(row, col).setData(
+                    Qt.EditRole, details[sort_field])
+            self.tableWidget.setSortingEnabled(True)
+        self.fill_visible_details()
+
+    def visible_rows(self):
+        """Returns the range of table rows currently inside the viewport."""
+        first = self.tableWidget.rowAt(0)
+        if first < 0:
+            return range(0)
+        last = self.tableWidget.rowAt(self.tableWidget.viewport().height() - 1)
+        if last < 0:
+            last = self.tableWidget.rowCount() - 1
+        return range(first, last + 1)
+
+    def fill_visible_details(self):
+        """Fetches the detail columns that are shown, for the rows in view."""
+        columns = [(col, key) for col, (_, key, _) in enumerate(PROCESS_COLUMNS)
+                   if key in DETAIL_FIELDS and not self.tableWidget.isColumnHidden(col)]
+        if not columns:
+            return
+        fields = tuple(key for _, key in columns)
+
+        # Re-sorting on a detail column can bring unfilled rows into view,
+        # so repeat until every visible row is filled
+        while True:
+            rows = []
+            for row in self.visible_rows():
+                name_item = self.tableWidget.item(row, 1)
+                # Rows filled during this tick are marked on the name cell
+                if name_item is not None and not name_item.data(Qt.UserRole):
+                    rows.append(row)
+            if not rows:
+                return
+
+            # Editing cells of the sort column would move rows while filling
+            self.tableWidget.setSortingEnabled(False)
+            for row in rows:
+                pid_item = self.tableWidget.item(row, 0)
+                details = getProcessDetails(
+                    pid_item.data(Qt.EditRole), pid_item.data(Qt.UserRole), fields)
+                for col, key in columns:
+                    self.tableWidget.item(row, col).setData(
+                        Qt.EditRole, details[key])
+                self.tableWidget.item(row, 1).setData(Qt.UserRole, True)
+            self.tableWidget.setSortingEnabled(True)
+
+    def open_column_menu(self, position):
+        menu = QMenu()
+        for col, (header, _, _) in enumerate(PROCESS_COLUMNS):
+            action = menu.addAction(header)
+            action.setCheckable(True)
+            action.setChecked(not self.tableWidget.isColumnHidden(col))
+            action.setData(col)
+        action = menu.exec_(
+            self.tableWidget.horizontalHeader().mapToGlobal(position))
+        if action is None:
+            return
+
+        col = action.data()
+        self.tableWidget.setColumnHidden(col, not action.isChecked())
+        self.settings.setValue("processes/hidden_columns", [
+            key for i, (_, key, _) in enumerate(PROCESS_COLUMNS)
+            if self.tableWidget.isColumnHidden(i)])
+
+        # Newly shown detail columns are fetched for the rows in view; rows
+        # further down are refetched once they are scrolled into view
+        if action.isChecked():
+            for row in range(self.tableWidget.rowCount()):
+                self.tableWidget.item(row, 1).setData(Qt.UserRole, None)
+            self.fill_visible_details()
+
     def open_context_menu(self, position):
         selected_item = self.tableWidget.itemAt(position)
         if selected_item:
@@ -176,6 +320,115 @@ class MainWindow(QWidget):
             )
 
 
+# cgroup table columns: (header, group key, default width)
+CGROUP_COLUMNS = [
+    ("cgroup", "cgroup", 360),
+    ("CPU %", "cpu_percent", 80),
+    ("Memory (MB)", "memory", 110),
+    ("Disk Read (KB/s)", "read_kbps", 130),
+    ("Disk Write (KB/s)", "write_kbps", 130),
+    ("Tasks", "tasks", 70)
+]
+
+# Member process table columns: (header, process key, default width)
+CGROUP_MEMBER_COLUMNS = [
+    ("PID", "pid", 60),
+    ("Process Name", "name", 200),
+    ("Status", "status", 80),
+    ("Memory (MB)", "memory", 110),
+    ("Threads", "threads", 90)
+]
+
+
+class CgroupWindow(QWidget):
+    def __init__(self, monitor=None):
+        super().__init__()
+
+        # A monitor over another root (e.g. a fake tree) can be passed in
+        self.monitor = monitor if monitor is not None else CgroupMonitor()
+        self.selected_cgroup = None
+
+        # Per-group totals read from the cgroup v2 files
+        self.groupTable = self._create_table(CGROUP_COLUMNS)
+        self.groupTable.sortByColumn(1, QtCore.Qt.DescendingOrder)
+        self.groupTable.itemSelectionChanged.connect(self.drill_down)
+
+        # Member processes of the selected group
+        self.memberTable = self._create_table(CGROUP_MEMBER_COLUMNS)
+        self.memberTable.sortByColumn(3, QtCore.Qt.DescendingOrder)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.groupTable)
+        layout.addWidget(self.memberTable)
+        layout.setStretch(0, 2)
+        layout.setStretch(1, 1)
+        self.setLayout(layout)
+
+        # Timer to update the cgroup list
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.update_cgroups)
+
+    def _create_table(self, columns):
+        table = QTableWidget(self)
+        table.setColumnCount(len(columns))
+        table.setHorizontalHeaderLabels([header for header, _, _ in columns])
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setSelectionMode(QAbstractItemView.SingleSelection)
+        table.setSortingEnabled(True)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        for i, (_, _, width) in enumerate(columns):
+            table.setColumnWidth(i, width)
+        return table
+
+    def start_cgroup_update(self):
+        self.update_cgroups()
+        self.timer.start(1000)  # Update every second
+
+    def stop_cgroup_update(self):
+        self.timer.stop()
+
+    def _fill_table(self, table, columns, rows):
+        table.setUpdatesEnabled(False)
+        # Keep rows in place while filling; the table re-sorts when re-enabled
+        table.setSortingEnabled(False)
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for col, (_, key, _) in enumerate(columns):
+                # Use setData with Qt.EditRole for proper numeric sorting
+                item = QTableWidgetItem()
+                item.setData(Qt.EditRole, values[key])
+                table.setItem(row, col, item)
+        table.setSortingEnabled(True)
+        table.setUpdatesEnabled(True)
+
+    def update_cgroups(self):
+        groups = self.monitor.getCgroups()
+
+        # Filling the table resets the selection, so restore it afterwards
+        selected = self.selected_cgroup
+        self.groupTable.blockSignals(True)
+        self._fill_table(self.groupTable, CGROUP_COLUMNS, groups)
+        for row in range(self.groupTable.rowCount()):
+            if self.groupTable.item(row, 0).text() == selected:
+                self.groupTable.selectRow(row)
+                break
+        self.groupTable.blockSignals(False)
+
+        self.update_members()
+
+    def drill_down(self):
+        rows = self.groupTable.selectionModel().selectedRows()
+        self.selected_cgroup = self.groupTable.item(
+            rows[0].row(), 0).text() if rows else None
+        self.update_members()
+
+    def update_members(self):
+        members = []
+        if self.selected_cgroup is not None:
+            members = self.monitor.getCgroupProcesses(self.selected_cgroup)
+        self._fill_table(self.memberTable, CGROUP_MEMBER_COLUMNS, members)
+
+
 class PieChartWindow(QWidget):
     def __init__(self):
         super().__init__()